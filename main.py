@@ -1,14 +1,21 @@
-import uuid
-from typing import List, Dict, Set
+import secrets
+import asyncio
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional, Set, Tuple
 from dotenv import load_dotenv
 import os
 # Remove Supabase import
-import psycopg2
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+import asyncpg
+from cachetools import LRUCache
+from fastapi import BackgroundTasks, FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from services.chroma_service import ChromaService
 from services.llm_service import LLMService
 import json
+import orjson
 
 # Load environment variables
 load_dotenv()
@@ -20,16 +27,27 @@ DB_HOST = os.getenv("host")
 DB_PORT = os.getenv("port")
 DB_NAME = os.getenv("dbname")
 
-def get_db_connection():
-    return psycopg2.connect(
+app = FastAPI(title="Hack4Gaza", description="Hack4Gaza", default_response_class=ORJSONResponse)
+
+@app.on_event("startup")
+async def open_db_pool():
+    # One process-wide pool so requests don't pay a TCP + SSL handshake each time
+    app.state.pg = await asyncpg.create_pool(
         user=DB_USER,
         password=DB_PASSWORD,
         host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME
+        port=int(DB_PORT) if DB_PORT else None,
+        database=DB_NAME,
+        min_size=5,
+        max_size=20
     )
 
-app = FastAPI(title="Hack4Gaza", description="Hack4Gaza")
+@app.on_event("shutdown")
+async def close_db_pool():
+    # Write out any buffered expert responses, and wait for flushes already in flight, before the pool goes away
+    await _flush_answers()
+    await asyncio.gather(*list(_answer_flush_tasks))
+    await app.state.pg.close()
 
 # Initialize services
 chroma_service = ChromaService()
@@ -60,8 +78,53 @@ class AddExpertResponse(BaseModel):
     expertise: str
     description: str
 
-# In-memory storage for queries and expert responses
-queries_db = {}
+class AddExpertsBulkRequest(BaseModel):
+    experts: List[AddExpertRequest]
+
+class AddExpertsBulkResponse(BaseModel):
+    experts: List[AddExpertResponse]
+
+# In-memory storage for recent queries and expert responses, bounded so it can't grow for
+# the life of the worker; older queries are loaded back from Postgres on demand
+QUERIES_DB_SIZE = 10_000
+queries_db = LRUCache(maxsize=QUERIES_DB_SIZE)
+
+# LRU cache of (top_experts, llm_answer) for repeated questions, keyed by normalized query text
+class QueryCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl  # seconds, so newly added experts eventually show up
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+query_cache = QueryCache()
+
+# Serialized JSON per query for /query_list and /all_answers; entries are dropped when a query changes
+query_list_cache = LRUCache(maxsize=QUERIES_DB_SIZE)
+all_answers_cache = LRUCache(maxsize=QUERIES_DB_SIZE)
 
 from datetime import datetime
 
@@ -79,116 +142,327 @@ class SubmitExpertResponseRequest(BaseModel):
 
 # WebSocket manager for real-time expert response updates
 class ConnectionManager:
+    # Messages a client may fall behind by before it is dropped
+    send_queue_size = 64
+
     def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {}  # query_id -> set of websockets
+        # query_id -> websockets; tuples are replaced on connect/disconnect so broadcast can iterate without copying
+        self.active_connections: Dict[str, Tuple[WebSocket, ...]] = {}
+        self.send_queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.send_tasks: Dict[WebSocket, asyncio.Task] = {}
+        self.drop_tasks: Set[asyncio.Task] = set()
 
     async def connect(self, query_id: str, websocket: WebSocket):
         await websocket.accept()
-        if query_id not in self.active_connections:
-            self.active_connections[query_id] = set()
-        self.active_connections[query_id].add(websocket)
+        self.active_connections[query_id] = self.active_connections.get(query_id, ()) + (websocket,)
+        # Each client gets its own queue and sender so clients are written to concurrently
+        queue = asyncio.Queue(maxsize=self.send_queue_size)
+        self.send_queues[websocket] = queue
+        self.send_tasks[websocket] = asyncio.create_task(self._sender(query_id, websocket, queue))
 
     def disconnect(self, query_id: str, websocket: WebSocket):
-        if query_id in self.active_connections:
-            self.active_connections[query_id].discard(websocket)
-            if not self.active_connections[query_id]:
-                del self.active_connections[query_id]
+        connections = tuple(c for c in self.active_connections.get(query_id, ()) if c is not websocket)
+        if connections:
+            self.active_connections[query_id] = connections
+        else:
+            self.active_connections.pop(query_id, None)
+        self.send_queues.pop(websocket, None)
+        task = self.send_tasks.pop(websocket, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _sender(self, query_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        try:
+            while True:
+                await websocket.send_text(await queue.get())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(query_id, websocket)
+
+    async def _drop(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
 
     async def broadcast(self, query_id: str, message: dict):
-        if query_id in self.active_connections:
-            for connection in list(self.active_connections[query_id]):
+        connections = self.active_connections.get(query_id, ())
+        if connections:
+            # Serialize once with orjson; sent as text so clients still receive JSON strings
+            data = orjson.dumps(message).decode()
+            for connection in connections:
                 try:
-                    await connection.send_json(message)
-                except Exception:
+                    self.send_queues[connection].put_nowait(data)
+                except (KeyError, asyncio.QueueFull):
+                    # Slow or dead client: drop it instead of holding up everyone else
                     self.disconnect(query_id, connection)
+                    task = asyncio.create_task(self._drop(connection))
+                    self.drop_tasks.add(task)
+                    task.add_done_callback(self.drop_tasks.discard)
 
 manager = ConnectionManager()
 
+# Postgres writes run as background tasks so responses don't wait on the DB round-trip
+async def _persist_query(query_id: str, question: str, llm_answer: str, assigned_experts: str):
+    try:
+        await app.state.pg.execute(
+            """
+            INSERT INTO queries (id, question, llm_answer, assigned_experts)
+            VALUES ($1, $2, $3, $4)
+            """,
+            query_id, question, llm_answer, assigned_experts
+        )
+    except Exception as db_e:
+        print(f"Postgres error storing query {query_id}: {db_e}")
+
+# Expert responses are buffered and written in batches with executemany
+ANSWER_BATCH_SIZE = 32
+ANSWER_FLUSH_DELAY = 0.05  # seconds
+pending_answers: List[tuple] = []
+_answer_flush_handle = None
+_answer_flush_tasks: Set[asyncio.Task] = set()
+
+def _queue_expert_response(query_id: str, response_obj: dict, timestamp: datetime):
+    global _answer_flush_handle
+    pending_answers.append((
+        query_id,
+        response_obj["expert_id"],
+        response_obj["expert_name"],
+        response_obj["response"],
+        timestamp  # asyncpg encodes by column type, so pass the datetime rather than the ISO string
+    ))
+    if len(pending_answers) >= ANSWER_BATCH_SIZE:
+        _schedule_answer_flush()
+    elif _answer_flush_handle is None:
+        _answer_flush_handle = asyncio.get_running_loop().call_later(ANSWER_FLUSH_DELAY, _schedule_answer_flush)
+
+def _schedule_answer_flush():
+    task = asyncio.create_task(_flush_answers())
+    _answer_flush_tasks.add(task)
+    task.add_done_callback(_answer_flush_tasks.discard)
+
+async def _flush_answers():
+    global _answer_flush_handle
+    if _answer_flush_handle is not None:
+        _answer_flush_handle.cancel()
+        _answer_flush_handle = None
+    if not pending_answers:
+        return
+    rows = pending_answers[:]
+    pending_answers.clear()
+    try:
+        await app.state.pg.executemany(
+            """
+            INSERT INTO answers (query_id, expert_id, expert_name, response, timestamp)
+            VALUES ($1, $2, $3, $4, $5)
+            """,
+            rows
+        )
+    except Exception as db_e:
+        print(f"Postgres error storing {len(rows)} expert responses: {db_e}")
+
+async def _persist_experts(experts: List[dict]):
+    try:
+        await app.state.pg.executemany(
+            """
+            INSERT INTO experts (id, name, expertise, description)
+            VALUES ($1, $2, $3, $4)
+            """,
+            [(e["id"], e["name"], e["expertise"], e["description"]) for e in experts]
+        )
+    except Exception as db_e:
+        print(f"Postgres error storing {len(experts)} experts: {db_e}")
+
+async def _load_query(query_id: str) -> Optional["UserQuery"]:
+    """Get a query from memory, falling back to Postgres for ones evicted or stored by another worker"""
+    query = queries_db.get(query_id)
+    if query is not None:
+        return query
+    try:
+        async with app.state.pg.acquire() as conn:
+            row = await conn.fetchrow(
+                "SELECT id, question, llm_answer, assigned_experts FROM queries WHERE id = $1",
+                query_id
+            )
+            if row is None:
+                return None
+            answers = await conn.fetch(
+                """
+                SELECT expert_id, expert_name, response, timestamp
+                FROM answers WHERE query_id = $1 ORDER BY timestamp
+                """,
+                query_id
+            )
+    except asyncpg.DataError:
+        # Not a valid id for the column (e.g. not a UUID), so no such query
+        return None
+    assigned_experts = row["assigned_experts"]
+    if isinstance(assigned_experts, str):
+        assigned_experts = json.loads(assigned_experts)
+    query = UserQuery(
+        id=query_id,  # keep the id the client used, not Postgres' formatting of it
+        question=row["question"],
+        assigned_experts=assigned_experts,
+        llm_answer=row["llm_answer"] or "",
+        expert_responses=[
+            {
+                "expert_id": a["expert_id"],
+                "expert_name": a["expert_name"],
+                "response": a["response"],
+                "timestamp": a["timestamp"].isoformat() if hasattr(a["timestamp"], "isoformat") else a["timestamp"]
+            }
+            for a in answers
+        ]
+    )
+    queries_db[query_id] = query
+    return query
+
 @app.get("/")
 async def root():
     return {"message": "All is up nd running"}
 
 @app.post("/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
+async def process_query(request: QueryRequest, background_tasks: BackgroundTasks):
     try:
-        # Use ChromaDB's built-in similarity search to get top 5 experts
+        cache_key = QueryCache.normalize(request.query)
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            # Same question seen recently: skip embedding, search and LLM
+            top_experts, llm_answer = cached
+        else:
+            # Expert search and LLM answer are independent, so run them concurrently
+            experts_task = asyncio.create_task(chroma_service.search_similar_experts(
+                query=request.query,
+                top_k=5
+            ))
+            answer_task = asyncio.create_task(llm_service.get_answer(request.query))
+            top_experts = await experts_task
+            print(top_experts)
+            if not top_experts:
+                answer_task.cancel()
+                raise HTTPException(status_code=404, detail="No experts found in database")
+            llm_answer = await answer_task
+            if llm_answer:
+                query_cache.set(cache_key, (top_experts, llm_answer))
+        # Store query in DB
+        query_id = secrets.token_hex(16)
+        queries_db[query_id] = UserQuery(
+            id=query_id,
+            question=request.query,
+            assigned_experts=top_experts,
+            llm_answer=llm_answer,
+            expert_responses=[]
+        )
+        # Store in Postgres after the response is sent
+        background_tasks.add_task(
+            _persist_query,
+            query_id, request.query, llm_answer, json.dumps(top_experts)
+        )
+        # Return the plain dicts directly, skipping response model validation
+        return ORJSONResponse({"experts": top_experts, "llm_answer": llm_answer, "query_id": query_id})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
+
+@app.post("/query/stream")
+async def process_query_stream(request: QueryRequest, background_tasks: BackgroundTasks):
+    """Same as /query, but streams the LLM answer as Server-Sent Events"""
+    cache_key = QueryCache.normalize(request.query)
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        top_experts, cached_answer = cached
+    else:
+        cached_answer = None
         top_experts = await chroma_service.search_similar_experts(
             query=request.query,
             top_k=5
         )
-        print(top_experts)
         if not top_experts:
             raise HTTPException(status_code=404, detail="No experts found in database")
-        # Get LLM answer for the query
-        llm_answer = await llm_service.get_answer(request.query)
-        # Format response
-        expert_responses = [
-            ExpertResponse(
-                id=expert["id"],
-                name=expert["name"],
-                expertise=expert["expertise"],
-                description=expert["description"],
-                similarity_score=expert["similarity_score"]
-            )
-            for expert in top_experts
-        ]
-        # Store query in DB
-        query_id = str(uuid.uuid4())
+    query_id = secrets.token_hex(16)
+    answer_parts: List[str] = []
+    # Only set once the whole answer has been streamed; failed or disconnected streams stay False
+    completed = False
+    final_answer = ""
+
+    async def event_stream():
+        nonlocal completed, final_answer
+        yield b"data: " + orjson.dumps({"experts": top_experts}) + b"\n\n"
+        if cached_answer is not None:
+            # Recently answered: send the whole cached answer as one token
+            answer_parts.append(cached_answer)
+            yield b"data: " + orjson.dumps({"token": cached_answer}) + b"\n\n"
+        else:
+            try:
+                async for token in llm_service.stream_answer(request.query):
+                    answer_parts.append(token)
+                    yield b"data: " + orjson.dumps({"token": token}) + b"\n\n"
+            except Exception as e:
+                yield b"data: " + orjson.dumps({"error": f"Error getting LLM answer: {e}"}) + b"\n\n"
+                return
+        # Store the query before handing out its id, so it is usable as soon as the client sees it
+        llm_answer = "".join(answer_parts).strip()
+        if llm_answer and cached_answer is None:
+            query_cache.set(cache_key, (top_experts, llm_answer))
         queries_db[query_id] = UserQuery(
             id=query_id,
             question=request.query,
-            assigned_experts=expert_responses,
+            assigned_experts=top_experts,
             llm_answer=llm_answer,
             expert_responses=[]
         )
-        # Store in Postgres
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO queries (id, question, llm_answer, assigned_experts)
-                VALUES (%s, %s, %s, %s)
-                """,
-                (query_id, request.query, llm_answer, json.dumps([ex.dict() for ex in expert_responses]))
-            )
-            conn.commit()
-            cursor.close()
-            conn.close()
-        except Exception as db_e:
-            raise HTTPException(status_code=500, detail=f"Postgres error: {db_e}")
-        return {"experts": expert_responses, "llm_answer": llm_answer, "query_id": query_id}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
+        final_answer = llm_answer
+        completed = True
+        yield b"data: " + orjson.dumps({"done": True, "query_id": query_id}) + b"\n\n"
+
+    async def store_streamed_query():
+        # Runs after the stream ends; failed or interrupted streams are never persisted
+        if not completed:
+            return
+        await _persist_query(query_id, request.query, final_answer, json.dumps(top_experts))
+
+    background_tasks.add_task(store_streamed_query)
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.get("/query/{query_id}")
 async def get_query(query_id: str):
-    query = queries_db.get(query_id)
+    query = await _load_query(query_id)
     if not query:
         raise HTTPException(status_code=404, detail="Query not found")
     return query
 
-@app.get("/query_list")
-async def get_query_list():
-    # Return all queries in the queries_db
-    return {
-        "queries": [
+def _serialize_query(q, include_responses: bool) -> bytes:
+    data = {
+        "id": q.id,
+        "question": q.question,
+        "assigned_experts": [
             {
-                "id": q.id,
-                "question": q.question,
-                "assigned_experts": [
-                    {
-                        "id": ex.id,
-                        "name": ex.name,
-                        "expertise": ex.expertise,
-                        "description": ex.description,
-                        "similarity_score": ex.similarity_score,
-                    } for ex in q.assigned_experts
-                ],
-            }
-            for q in queries_db.values()
-        ]
+                "id": ex.id,
+                "name": ex.name,
+                "expertise": ex.expertise,
+                "description": ex.description,
+                "similarity_score": ex.similarity_score,
+            } for ex in q.assigned_experts
+        ],
     }
+    if include_responses:
+        data["expert_responses"] = q.expert_responses
+    return orjson.dumps(data)
+
+def _queries_json(cache: Dict[str, bytes], include_responses: bool) -> Response:
+    # Reuse each query's cached bytes and only serialize queries that changed
+    parts = []
+    for q in queries_db.values():
+        cached = cache.get(q.id)
+        if cached is None:
+            cached = cache[q.id] = _serialize_query(q, include_responses)
+        parts.append(cached)
+    return Response(content=b'{"queries":[' + b",".join(parts) + b"]}", media_type="application/json")
+
+@app.get("/query_list")
+async def get_query_list():
+    # Return the queries held in the queries_db
+    return _queries_json(query_list_cache, include_responses=False)
 
 @app.websocket("/ws/query/{query_id}")
 async def websocket_endpoint(websocket: WebSocket, query_id: str):
@@ -201,75 +475,71 @@ async def websocket_endpoint(websocket: WebSocket, query_id: str):
 
 @app.post("/query/{query_id}/expert_response")
 async def submit_expert_response(query_id: str, req: SubmitExpertResponseRequest):
-    query = queries_db.get(query_id)
+    query = await _load_query(query_id)
     if not query:
         raise HTTPException(status_code=404, detail="Query not found")
     # Add expert response
+    timestamp = datetime.utcnow()
     response_obj = {
         "expert_id": req.expert_id,
         "expert_name": req.expert_name,
         "response": req.response,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": timestamp.isoformat()
     }
     query.expert_responses.append(response_obj)
-    # Store in Postgres
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO answers (query_id, expert_id, expert_name, response, timestamp)
-            VALUES (%s, %s, %s, %s, %s)
-            """,
-            (query_id, req.expert_id, req.expert_name, req.response, response_obj["timestamp"])
-        )
-        conn.commit()
-        cursor.close()
-        conn.close()
-    except Exception as db_e:
-        raise HTTPException(status_code=500, detail=f"Postgres error: {db_e}")
+    all_answers_cache.pop(query_id, None)
+    # Buffered and written to Postgres in a batch shortly after
+    _queue_expert_response(query_id, response_obj, timestamp)
     # Broadcast to all websocket clients listening for this query
     await manager.broadcast(query_id, {"type": "expert_response", "data": response_obj})
     return {"detail": "Expert response submitted."}
 
 @app.post("/experts", response_model=AddExpertResponse)
-async def add_expert(request: AddExpertRequest):
+async def add_expert(request: AddExpertRequest, background_tasks: BackgroundTasks):
     """Add a new expert to the ChromaDB collection and Postgres"""
     try:
         expert = {
-            "id": str(uuid.uuid4()),
+            "id": secrets.token_hex(16),
             "name": request.name,
             "expertise": request.expertise,
             "description": request.description
         }
-        chroma_service.add_expert(expert)
-        # Store in Postgres
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO experts (id, name, expertise, description)
-                VALUES (%s, %s, %s, %s)
-                """,
-                (expert["id"], expert["name"], expert["expertise"], expert["description"])
-            )
-            conn.commit()
-            cursor.close()
-            conn.close()
-        except Exception as db_e:
-            raise HTTPException(status_code=500, detail=f"Postgres error: {db_e}")
+        # Coalesced with concurrent adds into a single Chroma write
+        await chroma_service.queue_expert(expert)
+        # Store in Postgres after the response is sent
+        background_tasks.add_task(_persist_experts, [expert])
         return AddExpertResponse(**expert)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding expert: {str(e)}")
 
+@app.post("/experts/bulk", response_model=AddExpertsBulkResponse)
+async def add_experts_bulk(request: AddExpertsBulkRequest, background_tasks: BackgroundTasks):
+    """Add many experts with a single ChromaDB write"""
+    try:
+        experts = [
+            {
+                "id": secrets.token_hex(16),
+                "name": e.name,
+                "expertise": e.expertise,
+                "description": e.description
+            }
+            for e in request.experts
+        ]
+        await asyncio.to_thread(chroma_service.add_experts_bulk, experts)
+        # Store in Postgres after the response is sent
+        background_tasks.add_task(_persist_experts, experts)
+        return AddExpertsBulkResponse(experts=[AddExpertResponse(**e) for e in experts])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error adding experts: {str(e)}")
+
 
 
 @app.get("/experts/info")
 async def get_experts_info():
     """Get information about the experts collection"""
     try:
-        info = chroma_service.get_collection_info()
+        # May wait on the collection lock held by adds/queries in worker threads
+        info = await asyncio.to_thread(chroma_service.get_collection_info)
         return {
             "collection_name": info["name"],
             "expert_count": info["count"],
@@ -293,41 +563,37 @@ async def get_all_experts():
 async def clear_all_experts():
     """Delete all experts from the ChromaDB collection"""
     try:
-        # Get all IDs in the collection
-        results = chroma_service.collection.get()
-        all_ids = results["ids"]
-        if all_ids:
-            chroma_service.collection.delete(ids=all_ids)
+        # Waits on the collection lock and drops the index on disk, so keep it off the event loop
+        await asyncio.to_thread(chroma_service.clear_all_experts)
+        # Cached answers point at experts that no longer exist
+        query_cache.clear()
         return {"detail": "All experts deleted successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error clearing experts: {str(e)}")
 
 @app.delete("/queries")
 async def clear_all_queries():
+    global _answer_flush_handle
+    # Drop buffered answers and wait for flushes already running, so nothing is written after the delete
+    if _answer_flush_handle is not None:
+        _answer_flush_handle.cancel()
+        _answer_flush_handle = None
+    pending_answers.clear()
+    await asyncio.gather(*list(_answer_flush_tasks))
     queries_db.clear()
+    query_list_cache.clear()
+    all_answers_cache.clear()
+    # Also delete them from Postgres, otherwise the /query/{id} fallback would bring them back
+    try:
+        async with app.state.pg.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("DELETE FROM answers")
+                await conn.execute("DELETE FROM queries")
+    except Exception as db_e:
+        raise HTTPException(status_code=500, detail=f"Postgres error: {db_e}")
     return {"detail": "All queries and answers deleted successfully."}
 
 @app.get("/all_answers")
 async def get_all_answers():
     # Return all queries with their expert responses
-    return {
-        "queries": [
-            {
-                "id": q.id,
-                "question": q.question,
-                "assigned_experts": [
-                    {
-                        "id": ex.id,
-                        "name": ex.name,
-                        "expertise": ex.expertise,
-                        "description": ex.description,
-                        "similarity_score": ex.similarity_score,
-                    } for ex in q.assigned_experts
-                ],
-                "expert_responses": q.expert_responses,
-            }
-            for q in queries_db.values()
-        ]
-    }
-
-
+    return _queries_json(all_answers_cache, include_responses=True)
@@ -1,7 +1,9 @@
 import os
+import asyncio
+import threading
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 import uuid
 from chromadb.api.types import EmbeddingFunction, Documents, Embeddings
 import google.generativeai as genai
@@ -13,15 +15,19 @@ class GeminiEmbeddingFunction(EmbeddingFunction[Documents]):
             raise ValueError("GEMINI_API_KEY environment variable is required")
         genai.configure(api_key=self.api_key)
 
+    # Max texts per batchEmbedContents request
+    batch_size = 100
+
     def __call__(self, input: Documents) -> Embeddings:
+        # Send texts as lists so each batch is one HTTPS call instead of one per text
         embeddings = []
-        for text in input:
+        for start in range(0, len(input), self.batch_size):
             result = genai.embed_content(
                 model="models/text-embedding-004",
-                content=text,
+                content=list(input[start:start + self.batch_size]),
                 task_type="retrieval_document"
             )
-            embeddings.append(result['embedding'])
+            embeddings.extend(result['embedding'])
         return embeddings
 
 class ChromaService:
@@ -35,59 +41,148 @@ class ChromaService:
             settings=Settings(anonymized_telemetry=False)
         )
         
-        # Use the Gemini embedding function
+        # Use the Gemini embedding function; embeddings are computed here and
+        # passed to Chroma so it never re-encodes documents or queries itself
         self.embedding_function = GeminiEmbeddingFunction()
-        # Get or create the experts collection with the custom embedding function
-        self.collection = self.client.get_or_create_collection(
+        # Guards swapping the collection out in clear_all_experts against concurrent adds/queries
+        self._collection_lock = threading.Lock()
+        self.collection = self._get_or_create_collection()
+
+        # Single inserts that arrive while a write is in flight are coalesced into one collection.add call
+        self._pending_experts: List[Dict[str, Any]] = []
+        self._pending_futures: List[asyncio.Future] = []
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.batch_max_size = 64
+
+        # Count and expert list only change on add/clear, so cache them until then
+        self._count_cache: Optional[int] = None
+        self._experts_cache: Optional[List[Dict[str, Any]]] = None
+    
+    def _get_or_create_collection(self):
+        return self.client.get_or_create_collection(
             name="experts",
-            embedding_function=self.embedding_function,
+            embedding_function=None,
             metadata={"hnsw:space": "cosine"}
         )
     
-    def add_expert(self, expert: Dict[str, Any]):
-        """Add a new expert to the collection"""
-        
-        # Combine expertise and description for embedding
-        text = f"{expert['expertise']} {expert['description']}"
-        
-        self.collection.add(
-            documents=[text],
-            metadatas=[{
-                "name": expert["name"],
-                "expertise": expert["expertise"],
-                "description": expert["description"]
-            }],
-            ids=[expert["id"]]
-        )
+    def add_experts_bulk(self, experts: List[Dict[str, Any]]):
+        """Add many experts with a single collection.add call"""
+        if not experts:
+            return
+
+        documents = [f"{e['expertise']} {e['description']}" for e in experts]
+        embeddings = self.embedding_function(documents)
+        with self._collection_lock:
+            self.collection.add(
+                documents=documents,
+                embeddings=embeddings,
+                metadatas=[{
+                    "name": e["name"],
+                    "expertise": e["expertise"],
+                    "description": e["description"]
+                } for e in experts],
+                ids=[e["id"] for e in experts]
+            )
+            self._on_experts_added(len(experts))
+
+    def _on_experts_added(self, n: int):
+        if self._count_cache is not None:
+            self._count_cache += n
+        self._experts_cache = None
+
+    def clear_all_experts(self):
+        """Delete all experts from the collection"""
+        # Dropping and recreating the collection removes the HNSW index directly,
+        # instead of loading every id into memory just to delete them
+        with self._collection_lock:
+            self.client.delete_collection("experts")
+            self.collection = self._get_or_create_collection()
+            self._count_cache = 0
+            self._experts_cache = []
+
+    async def queue_expert(self, expert: Dict[str, Any]):
+        """Add an expert, batching it with other adds that arrive while a write is in flight (up to 64 items)"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending_experts.append(expert)
+        self._pending_futures.append(future)
+
+        if not self._flush_tasks or len(self._pending_experts) >= self.batch_max_size:
+            self._start_flush()
+
+        await future
+
+    def _start_flush(self):
+        experts, futures = self._pending_experts, self._pending_futures
+        self._pending_experts, self._pending_futures = [], []
+        if not experts:
+            return
+        task = asyncio.create_task(self._flush(experts, futures))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, experts: List[Dict[str, Any]], futures: List[asyncio.Future]):
+        try:
+            # Embedding and the Chroma write block, so run them off the event loop
+            await asyncio.to_thread(self.add_experts_bulk, experts)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+        # This flush is done: drop it now, not on the next loop pass, so an add arriving
+        # before then starts its own flush instead of waiting on this one
+        self._flush_tasks.discard(asyncio.current_task())
+        # Write out whatever queued up while this batch was in flight
+        if self._pending_experts:
+            self._start_flush()
     
     async def get_experts(self) -> List[Dict[str, Any]]:
         """Get all experts from the collection"""
+        experts = self._experts_cache
+        if experts is not None:
+            return list(experts)
         try:
-            results = self.collection.get()
-            
-            experts = []
-            for i, doc_id in enumerate(results["ids"]):
-                expert = {
-                    "id": doc_id,
-                    "name": results["metadatas"][i]["name"],
-                    "expertise": results["metadatas"][i]["expertise"],
-                    "description": results["metadatas"][i]["description"]
-                }
-                experts.append(expert)
-            
-            return experts
+            return list(await asyncio.to_thread(self._load_experts))
             
         except Exception as e:
             print(f"Error fetching experts from ChromaDB: {e}")
             return []
     
+    def _load_experts(self) -> List[Dict[str, Any]]:
+        # Read and cache under the lock so an add in another thread can't slip in between
+        with self._collection_lock:
+            if self._experts_cache is None:
+                results = self.collection.get()
+                
+                experts = []
+                for i, doc_id in enumerate(results["ids"]):
+                    expert = {
+                        "id": doc_id,
+                        "name": results["metadatas"][i]["name"],
+                        "expertise": results["metadatas"][i]["expertise"],
+                        "description": results["metadatas"][i]["description"]
+                    }
+                    experts.append(expert)
+                
+                self._experts_cache = experts
+            return self._experts_cache
+    
+    def _query_collection(self, query: str, top_k: int):
+        query_embedding = self.embedding_function([query])[0]
+        with self._collection_lock:
+            return self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=top_k
+            )
+    
     async def search_similar_experts(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Search for similar experts using ChromaDB's built-in similarity search"""
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=top_k
-            )
+            # Embedding and search block, so run them off the event loop
+            results = await asyncio.to_thread(self._query_collection, query, top_k)
             
             experts = []
             for i, doc_id in enumerate(results["ids"][0]):
@@ -108,8 +203,12 @@ class ChromaService:
     
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection"""
-        return {
-            "count": self.collection.count(),
-            "name": self.collection.name,
-            "metadata": self.collection.metadata
-        } 
\ No newline at end of file
+        # Read and cache under the lock so an add in another thread can't slip in between
+        with self._collection_lock:
+            if self._count_cache is None:
+                self._count_cache = self.collection.count()
+            return {
+                "count": self._count_cache,
+                "name": self.collection.name,
+                "metadata": self.collection.metadata
+            } 
\ No newline at end of file
@@ -1,5 +1,7 @@
 import os
-from openai import OpenAI
+import httpx
+from typing import AsyncIterator, Dict, List
+from openai import AsyncOpenAI
 
 class LLMService:
     def __init__(self):
@@ -9,29 +11,57 @@ class LLMService:
             print("Warning: GROQ_API_KEY not set")
             self.client = None
         else:
-            self.client = OpenAI(
+            # Async client with a pooled keep-alive connection so calls don't block
+            # the event loop or redo the TLS handshake every time
+            self.client = AsyncOpenAI(
                     base_url="https://api.groq.com/openai/v1",
-                    api_key=self.api_key
+                    api_key=self.api_key,
+                    http_client=httpx.AsyncClient(
+                        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                        timeout=httpx.Timeout(30.0, connect=2.0)
+                    )
                 )
     
+    def _messages(self, query: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful AI assistant. Provide clear, concise, and informative answers to user queries, structure it as a direct short paragraph."
+            },
+            {
+                "role": "user",
+                "content": query
+            }
+        ]
+    
     async def get_answer(self, query: str) -> str:
         try:
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="moonshotai/kimi-k2-instruct",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful AI assistant. Provide clear, concise, and informative answers to user queries, structure it as a direct short paragraph."
-                    },
-                    {
-                        "role": "user",
-                        "content": query
-                    }
-                ]
+                messages=self._messages(query)
             )
             
             return response.choices[0].message.content.strip()
             
         except Exception as e:
             print(f"Error getting LLM answer: {e}")    
+    
+    async def stream_answer(self, query: str) -> AsyncIterator[str]:
+        """Yield the answer token by token as the model generates it; raises if the stream fails"""
+        try:
+            
+            stream = await self.client.chat.completions.create(
+                model="moonshotai/kimi-k2-instruct",
+                messages=self._messages(query),
+                stream=True
+            )
+            
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            
+        except Exception as e:
+            print(f"Error streaming LLM answer: {e}")
+            # Re-raise so callers can tell a cut-off answer from a complete one
+            raise
@@ -1,82 +1,205 @@
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Dict, Any, Optional
 import re
+from functools import lru_cache
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is optional; without it the kernel below runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+    prange = range
+
+@njit(parallel=True, cache=True)
+def _jaccard_scores(q_ids, q_len, offsets, data):
+    """Jaccard score of the query against each expert's sorted, unique token ids"""
+    n = offsets.shape[0] - 1
+    scores = np.zeros(n, dtype=np.float32)
+    for e in prange(n):
+        start = offsets[e]
+        end = offsets[e + 1]
+        e_len = end - start
+        if e_len == 0:
+            continue
+        # Sorted merge to count the intersection
+        i = 0
+        j = start
+        overlap = 0
+        while i < q_ids.shape[0] and j < end:
+            if q_ids[i] == data[j]:
+                overlap += 1
+                i += 1
+                j += 1
+            elif q_ids[i] < data[j]:
+                i += 1
+            else:
+                j += 1
+        union = q_len + e_len - overlap
+        if union > 0:
+            scores[e] = overlap / union
+    return scores
+
+@lru_cache(maxsize=4)
+def _get_model(model_name: str) -> SentenceTransformer:
+    """Load a sentence transformer once per process, on GPU in FP16 when available"""
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    model = SentenceTransformer(model_name, device=device)
+    if device == 'cuda':
+        model.half()
+    # Warm up so the first real query doesn't pay one-off setup costs
+    model.encode(["warmup"], show_progress_bar=False)
+    return model
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, highest first, ties kept in input order (like a stable sort)"""
+    threshold = -np.partition(-scores, k - 1)[k - 1]
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+    candidates = np.concatenate([above, ties])
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+def _expert_text(expert: Dict[str, Any]) -> str:
+    # Combine expertise and description for better matching
+    return f"{expert.get('expertise', '')} {expert.get('description', '')}"
+
+def _experts_key(experts: List[Dict[str, Any]]) -> tuple:
+    # Ids alone aren't enough: experts may have no id, or be edited while keeping it
+    return tuple((expert.get('id'), _expert_text(expert)) for expert in experts)
 
 class SimilaritySearch:
     def __init__(self):
         try:
-            # Initialize the sentence transformer model
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            # Shared sentence transformer model, loaded once per process
+            self.model = _get_model('all-MiniLM-L6-v2')
             self.model_loaded = True
         except Exception as e:
             print(f"Warning: Could not load sentence transformer model: {e}")
             self.model_loaded = False
+        
+        # Indexed experts and their embeddings, set by index_experts
+        self._experts: List[Dict[str, Any]] = []
+        self.emb = None  # (N, D) float32, C-contiguous, L2-normalized rows
+        
+        # Tokenizer and per-expert token sets for the keyword fallback
+        self._tok = re.compile(r'\w+', re.UNICODE).findall
+        self._expert_token_cache: Dict[str, frozenset] = {}  # expert text -> token set
+        self._token_key = None
+        self._vocab: Dict[str, int] = {}
+        self._token_offsets = None
+        self._token_data = None
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in batches into L2-normalized numpy embeddings"""
+        return self.model.encode(
+            texts,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
     
-    def find_similar_experts(self, query: str, experts: List[Dict[str, Any]], top_k: int = 5) -> List[Dict[str, Any]]:
+    def index_experts(self, experts: List[Dict[str, Any]]):
         """
-        Find the top-k most similar experts to the given query using semantic similarity
+        Ingest experts once into a normalized embedding matrix. Call again whenever the experts
+        change; queries run against this index and don't re-check the expert dicts
+        """
+        self._experts = list(experts)
+        if not self.model_loaded:
+            return
+        matrix = self._encode([_expert_text(expert) for expert in self._experts]).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.emb = np.ascontiguousarray(matrix / norms)
+    
+    def find_similar_experts(self, query: str, experts: Optional[List[Dict[str, Any]]] = None, top_k: int = 5) -> List[Dict[str, Any]]:
         """
+        Find the top-k most similar experts to the given query using semantic similarity.
+        Passing experts indexes them first; omit it to query the experts already indexed
+        """
+        if experts is not None:
+            self.index_experts(experts)
+        experts = self._experts
         if not experts:
             return []
         
         if not self.model_loaded:
-            return self._fallback_similarity_search(query, experts, top_k)
+            return self.fallback_similarity_search(query, experts, top_k)
         
         try:
-            # Prepare expert texts for embedding
-            expert_texts = []
-            for expert in experts:
-                # Combine expertise and description for better matching
-                expert_text = f"{expert.get('expertise', '')} {expert.get('description', '')}"
-                expert_texts.append(expert_text)
-            
-            # Generate embeddings
-            query_embedding = self.model.encode([query])
-            expert_embeddings = self.model.encode(expert_texts)
             
-            # Calculate cosine similarities
-            similarities = cosine_similarity(query_embedding, expert_embeddings)[0]
+            # Rows are unit length, so one BLAS product gives every cosine similarity
+            query_embedding = self._encode([query])[0].astype(np.float32)
+            query_embedding /= np.linalg.norm(query_embedding) or 1.0
+            similarities = self.emb @ query_embedding
             
-            # Add similarity scores to experts and sort
-            for i, expert in enumerate(experts):
-                expert['similarity_score'] = float(similarities[i])
+            # Select the top-k in O(N), then sort only those
+            k = min(top_k, len(experts))
+            if k <= 0:
+                return []
+            top_indices = _top_k_indices(similarities, k)
             
-            # Sort by similarity score (descending) and return top-k
-            sorted_experts = sorted(experts, key=lambda x: x['similarity_score'], reverse=True)
-            return sorted_experts[:top_k]
+            top_experts = []
+            for i in top_indices:
+                expert_copy = experts[i].copy()
+                expert_copy['similarity_score'] = float(similarities[i])
+                top_experts.append(expert_copy)
+            return top_experts
             
         except Exception as e:
             print(f"Error in similarity search: {e}")
-            return self._fallback_similarity_search(query, experts, top_k)
+            return self.fallback_similarity_search(query, experts, top_k)
+    
+    def _expert_tokens(self, expert: Dict[str, Any]) -> frozenset:
+        """Return the expert's token set, tokenizing its text only on first encounter"""
+        expert_text = _expert_text(expert)
+        tokens = self._expert_token_cache.get(expert_text)
+        if tokens is None:
+            tokens = self._expert_token_cache[expert_text] = frozenset(self._tok(expert_text.lower()))
+        return tokens
+    
+    def _get_expert_tokens(self, experts: List[Dict[str, Any]]):
+        """Return expert token ids as (offsets, data), rebuilding only when the experts change"""
+        key = _experts_key(experts)
+        if key != self._token_key or self._token_data is None:
+            vocab: Dict[str, int] = {}
+            offsets = np.zeros(len(experts) + 1, dtype=np.int64)
+            token_ids: List[int] = []
+            for i, expert in enumerate(experts):
+                ids = sorted({vocab.setdefault(word, len(vocab)) for word in self._expert_tokens(expert)})
+                token_ids.extend(ids)
+                offsets[i + 1] = len(token_ids)
+            self._vocab = vocab
+            self._token_offsets = offsets
+            self._token_data = np.array(token_ids, dtype=np.int32)
+            self._token_key = key
+        return self._token_offsets, self._token_data
     
     def fallback_similarity_search(self, query: str, experts: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
         """
         Fallback similarity search using simple keyword matching when sentence transformers is not available
         """
-        query_lower = query.lower()
-        query_words = set(re.findall(r'\w+', query_lower))
+        if not experts or top_k <= 0:
+            return []
         
-        scored_experts = []
+        offsets, data = self._get_expert_tokens(experts)
         
-        for expert in experts:
-            # Combine expertise and description
-            expert_text = f"{expert.get('expertise', '')} {expert.get('description', '')}".lower()
-            expert_words = set(re.findall(r'\w+', expert_text))
-            
-            # Calculate simple word overlap score
-            if expert_words:
-                overlap = len(query_words.intersection(expert_words))
-                total_words = len(query_words.union(expert_words))
-                similarity_score = overlap / total_words if total_words > 0 else 0
-            else:
-                similarity_score = 0
-            
-            expert_copy = expert.copy()
-            expert_copy['similarity_score'] = similarity_score
-            scored_experts.append(expert_copy)
+        # Words missing from the vocab can't overlap but still count towards the union
+        query_words = set(self._tok(query.lower()))
+        q_ids = np.array(sorted(self._vocab[w] for w in query_words if w in self._vocab), dtype=np.int32)
+        
+        # Calculate simple word overlap (Jaccard) score for every expert at once
+        scores = _jaccard_scores(q_ids, len(query_words), offsets, data)
+        
+        # Select the top-k, then sort only those
+        k = min(top_k, len(experts))
+        top_indices = _top_k_indices(scores, k)
         
-        # Sort by similarity score and return top-k
-        sorted_experts = sorted(scored_experts, key=lambda x: x['similarity_score'], reverse=True)
-        return sorted_experts[:top_k]
\ No newline at end of file
+        top_experts = []
+        for i in top_indices:
+            expert_copy = experts[i].copy()
+            expert_copy['similarity_score'] = float(scores[i])
+            top_experts.append(expert_copy)
+        return top_experts